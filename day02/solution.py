@@ -1,3 +1,6 @@
+from typing import Iterator
+
+
 def is_repeated_twice(num_str: str) -> bool:
     """Vérifie si un nombre est composé d'une séquence répétée exactement deux fois.
     
@@ -33,12 +36,41 @@ def is_repeated_pattern(num_str: str) -> bool:
         >>> is_repeated_pattern("12345")
         False
     """
-    n = len(num_str)
-    return any(
-        num_str[:i] * (n // i) == num_str 
-        for i in range(1, n // 2 + 1) 
-        if n % i == 0 and n // i >= 2
-    )
+    # s est périodique ssi il réapparaît dans s+s avant la position len(s)
+    return (num_str + num_str).find(num_str, 1) != len(num_str)
+
+
+def generate_repeats_in(start: int, end: int, exactly_twice: bool = False) -> Iterator[int]:
+    """Énumère directement les nombres répétés de [start, end] sans parcourir la plage.
+    
+    Un nombre de L chiffres formé d'un motif h de p chiffres répété L/p fois vaut
+    h * (10**(L-p) + 10**(L-2p) + ... + 1) ; il suffit donc de parcourir les motifs h
+    dont le produit tombe dans la plage.
+    
+    Args:
+        start: Début de la plage (inclus)
+        end: Fin de la plage (incluse)
+        exactly_twice: Si True, seul le motif répété exactement deux fois est considéré
+        
+    Yields:
+        Les nombres répétés de la plage (un même nombre peut sortir pour plusieurs
+        périodes, ex. 222222, quand exactly_twice vaut False)
+        
+    Exemple:
+        >>> sorted(generate_repeats_in(10, 40, exactly_twice=True))
+        [11, 22, 33]
+    """
+    for length in range(len(str(start)), len(str(end)) + 1):
+        if exactly_twice:
+            periods = [length // 2] if length % 2 == 0 else []
+        else:
+            periods = [p for p in range(1, length // 2 + 1) if length % p == 0]
+        for period in periods:
+            multiplier = (10 ** length - 1) // (10 ** period - 1)
+            low = max(10 ** (period - 1), -(-start // multiplier))
+            high = min(10 ** period - 1, end // multiplier)
+            for pattern in range(low, high + 1):
+                yield pattern * multiplier
 
 
 def parse_ranges(input_line: str) -> list[tuple[int, int]]:
@@ -76,8 +108,7 @@ def solve_part1(ranges: list[tuple[int, int]]) -> int:
     return sum(
         num
         for start, end in ranges
-        for num in range(start, end + 1)
-        if is_repeated_twice(str(num))
+        for num in generate_repeats_in(start, end, exactly_twice=True)
     )
 
 
@@ -90,11 +121,10 @@ def solve_part2(ranges: list[tuple[int, int]]) -> int:
     Returns:
         La somme des nombres valides
     """
+    # un ensemble par plage : 222222 est produit par les périodes 1, 2 et 3
     return sum(
-        num
+        sum(set(generate_repeats_in(start, end)))
         for start, end in ranges
-        for num in range(start, end + 1)
-        if is_repeated_pattern(str(num))
     )
 
 
@@ -1,63 +1,39 @@
 from typing import List
-from dataclasses import dataclass
 
-@dataclass(frozen=True)
-class Position:
-    """Représente une position dans la grille."""
-    row: int
-    col: int
-
-    def __add__(self, other: 'Position') -> 'Position':
-        return Position(self.row + other.row, self.col + other.col)
-
-# Directions: N, NE, E, SE, S, SW, W, NW
-DIRECTIONS = [
-    Position(-1, 0), Position(-1, 1), Position(0, 1), Position(1, 1),
-    Position(1, 0), Position(1, -1), Position(0, -1), Position(-1, -1)
-]
+import numpy as np
 
 class PaperRollGrid:
-    """Classe pour gérer la grille de rouleaux de papier."""
+    """Classe pour gérer la grille de rouleaux de papier (tableau numpy de 0/1)."""
     
     def __init__(self, grid: List[str]):
-        self.grid = [list(row) for row in grid]
         self.rows = len(grid)
         self.cols = len(grid[0]) if self.rows > 0 else 0
+        self.grid = (np.array([list(row) for row in grid]).reshape(self.rows, self.cols) == '@').astype(np.int8)
     
-    def is_valid_position(self, pos: Position) -> bool:
-        """Vérifie si une position est valide dans la grille."""
-        return 0 <= pos.row < self.rows and 0 <= pos.col < self.cols
-    
-    def get_adjacent_rolls_count(self, pos: Position) -> int:
-        """Compte les rouleaux adjacents à une position."""
-        return sum(
-            1 for direction in DIRECTIONS
-            if self.is_valid_position(new_pos := pos + direction) and
-            self.grid[new_pos.row][new_pos.col] == '@'
-        )
+    def count_adjacent_rolls(self) -> np.ndarray:
+        """Compte, pour chaque case, les rouleaux adjacents (convolution 3x3 moins le centre)."""
+        # la bordure de zéros remplace le test de validité des positions ;
+        # le noyau 3x3 de uns est séparable : somme horizontale puis verticale
+        padded = np.pad(self.grid, 1)
+        rows_sum = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+        box = rows_sum[:-2] + rows_sum[1:-1] + rows_sum[2:]
+        return box - self.grid
     
-    def find_accessible_rolls(self) -> List[Position]:
-        """Trouve tous les rouleaux accessibles (moins de 4 rouleaux adjacents)."""
-        return [
-            Position(row, col)
-            for row in range(self.rows)
-            for col in range(self.cols)
-            if self.grid[row][col] == '@' and 
-            self.get_adjacent_rolls_count(Position(row, col)) < 4
-        ]
+    def find_accessible_rolls(self) -> np.ndarray:
+        """Masque des rouleaux accessibles (moins de 4 rouleaux adjacents)."""
+        return (self.grid == 1) & (self.count_adjacent_rolls() < 4)
     
-    def remove_rolls(self, positions: List[Position]) -> None:
-        """Supprime les rouleaux aux positions données."""
-        for pos in positions:
-            self.grid[pos.row][pos.col] = '.'
+    def remove_rolls(self, accessible: np.ndarray) -> None:
+        """Supprime les rouleaux désignés par le masque."""
+        self.grid[accessible] = 0
     
     def count_rolls(self) -> int:
         """Compte le nombre total de rouleaux restants."""
-        return sum(row.count('@') for row in self.grid)
+        return int(self.grid.sum())
 
 def solve_part1(grid: List[str]) -> int:
     """Résout la partie 1: compte les rouleaux accessibles par chariot élévateur."""
-    return len(PaperRollGrid(grid).find_accessible_rolls())
+    return int(PaperRollGrid(grid).find_accessible_rolls().sum())
 
 def solve_part2(grid: List[str]) -> int:
     """Résout la partie 2: compte le nombre total de rouleaux qui peuvent être enlevés."""
@@ -66,10 +42,10 @@ def solve_part2(grid: List[str]) -> int:
     
     while True:
         accessible = paper_grid.find_accessible_rolls()
-        if not accessible:
+        if not accessible.any():
             break
         paper_grid.remove_rolls(accessible)
-        total_removed += len(accessible)
+        total_removed += int(accessible.sum())
     
     return total_removed
 
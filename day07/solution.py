@@ -1,7 +1,8 @@
 from typing import List, Tuple, Dict, Set
 from dataclasses import dataclass
 import sys
-from collections import defaultdict
+
+import numpy as np
 
 @dataclass(frozen=True)
 class Position:
@@ -17,6 +18,18 @@ class TachyonSimulator:
         self.grid = grid
         self.rows = len(grid)
         self.cols = len(grid[0]) if self.rows > 0 else 0
+        # toute la grille dans un seul bloc d'octets contigu : la case
+        # (row, col) est l'octet row * cols + col ; vue numpy sans copie
+        self.data = ''.join(grid).encode()
+        cells = np.frombuffer(self.data, dtype=np.uint8).reshape(self.rows, self.cols)
+        is_splitter = cells == ord('^')
+        # splitters[row, col] == 1 là où se trouve un '^' (tableau numpy int64)
+        self.splitters = is_splitter.astype(np.int64)
+        # même information en masque de bits par ligne (bit col = '^')
+        self.split_masks = [
+            int.from_bytes(np.packbits(row, bitorder='little').tobytes(), 'little')
+            for row in is_splitter
+        ]
         self.start_pos = self._find_start()
         
     def _find_start(self) -> Position:
@@ -28,16 +41,11 @@ class TachyonSimulator:
         Raises:
             ValueError: Si 'S' n'est pas trouvé dans la grille
         """
-        for row_idx, row in enumerate(self.grid):
-            if 'S' in row:
-                return Position(row_idx, row.index('S'))
+        offset = self.data.find(b'S')
+        if offset != -1:
+            return Position(*divmod(offset, self.cols))
         raise ValueError("Position de départ 'S' non trouvée dans la grille")
     
-    def is_valid_position(self, pos: Position) -> bool:
-        """Vérifie si une position est valide dans la grille."""
-        return (0 <= pos.row < self.rows and 
-                0 <= pos.col < self.cols)
-    
     def count_beam_splits(self) -> int:
         """Compte le nombre total de divisions de faisceau (Partie 1).
         
@@ -47,35 +55,19 @@ class TachyonSimulator:
         if not self.start_pos:
             return 0
             
-        beams = [Position(self.start_pos.row + 1, self.start_pos.col)]
-        processed = set()
+        # Seule l'accessibilité compte : chaque ligne est un masque de bits
+        # (bit col = une position atteinte), traité en entier Python d'un bloc
+        inside = (1 << self.cols) - 1
+        beams = 1 << self.start_pos.col
         split_count = 0
         
-        while beams:
-            new_beams = []
-            
-            for pos in beams:
-                if not self.is_valid_position(pos) or pos in processed:
-                    continue
-                    
-                processed.add(pos)
-                char = self.grid[pos.row][pos.col]
-                
-                if char == '^':
-                    # Division du faisceau
-                    split_count += 1
-                    left = Position(pos.row + 1, pos.col - 1)
-                    right = Position(pos.row + 1, pos.col + 1)
-                    
-                    if self.is_valid_position(left):
-                        new_beams.append(left)
-                    if self.is_valid_position(right):
-                        new_beams.append(right)
-                else:
-                    # Déplacement vers le bas
-                    new_beams.append(Position(pos.row + 1, pos.col))
-            
-            beams = new_beams
+        for row in range(self.start_pos.row + 1, self.rows):
+            split_mask = self.split_masks[row]
+            split = beams & split_mask
+            # Division du faisceau : une division par séparateur atteint
+            split_count += bin(split).count('1')
+            # Déplacement vers le bas, ou à gauche et à droite après division
+            beams = ((beams & ~split_mask) | (split << 1) | (split >> 1)) & inside
         
         return split_count
     
@@ -88,43 +80,37 @@ class TachyonSimulator:
         if not self.start_pos:
             return 0
             
-        # Dictionnaire des chemins: (row, col) -> nombre de chemins
-        paths = defaultdict(int)
-        start = Position(self.start_pos.row + 1, self.start_pos.col)
-        paths[start] = 1
+        # Une ligne sans séparateur laisse tous les chemins descendre tout droit
+        # (transition identité) : seules les lignes avec un '^' sont traitées
+        split_rows = np.flatnonzero(self.splitters[self.start_pos.row + 1:].any(axis=1))
         
-        for current_row in range(self.start_pos.row + 1, self.rows + 1):
-            new_paths = defaultdict(int)
-            
-            for pos, count in paths.items():
-                if pos.row != current_row:
-                    continue
-                    
-                # Vérifie si on sort des limites
-                if not (0 <= pos.col < self.cols) or pos.row >= self.rows:
-                    new_paths[pos] += count
-                    continue
-                
-                char = self.grid[pos.row][pos.col]
-                
-                if char == '^':
-                    # Division quantique
-                    left = Position(pos.row + 1, pos.col - 1)
-                    right = Position(pos.row + 1, pos.col + 1)
-                    new_paths[left] += count
-                    new_paths[right] += count
-                else:
-                    # Déplacement vers le bas
-                    new_paths[Position(pos.row + 1, pos.col)] += count
-            
-            paths = new_paths
+        # Le DP avance d'une ligne à la fois : cur[col] -> nombre de chemins,
+        # et la transition d'une ligne est un gabarit à 3 points (décalages numpy)
+        cur = np.zeros(self.cols, dtype=np.int64)
+        cur[self.start_pos.col] = 1
+        exits = 0
+        # Nombre total de chemins : chaque division lui ajoute son compte, il
+        # au plus double par ligne. Tant qu'il reste sous 2**62 avant une ligne,
+        # rien ne peut dépasser 2**63 dans cette ligne ; au-delà on passe en
+        # entiers Python (dtype object) pour ne pas déborder
+        total = 1
+        
+        for row in (split_rows + self.start_pos.row + 1).tolist():
+            # Division quantique sur les séparateurs, déplacement vers le bas ailleurs
+            split = cur * self.splitters[row]
+            nxt = cur - split
+            nxt[1:] += split[:-1]
+            nxt[:-1] += split[1:]
+            # Sorties par les bords gauche et droit
+            exits += int(split[0]) + int(split[-1])
+            cur = nxt
+            if cur.dtype == np.int64:
+                total += int(split.sum())
+                if total >= 1 << 62:
+                    cur = cur.astype(object)
         
-        # Compte tous les chemins qui sortent de la grille
-        return sum(
-            count 
-            for pos, count in paths.items() 
-            if pos.row >= self.rows or not (0 <= pos.col < self.cols)
-        )
+        # Les chemins encore dans la grille sortent par le bas
+        return exits + int(cur.sum())
 
 def main() -> None:
     """Fonction principale."""
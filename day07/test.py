@@ -1,62 +1,232 @@
+from functools import lru_cache
+
+import numpy as np
+from numba import njit, prange
+
+
+@lru_cache(maxsize=4)
 def parse_manifold(text):
-    """Parse the manifold diagram from text."""
-    return text.strip().split('\n')
+    """
+    Parse the manifold diagram from text.
+    Returns (grid, start): the start S is located with one str.find on the
+    whole text, rows being cols + 1 characters apart (the '\n').
+    Results are cached, so grid is a tuple (shared, must not be mutated).
+    """
+    text = text.strip()
+    grid = tuple(text.split('\n'))
+    offset = text.find('S')
+    if offset == -1:
+        return grid, None
+    return grid, divmod(offset, len(grid[0]) + 1)
 
 
 def find_start(grid):
     """Find the starting position S."""
     for row_idx, row in enumerate(grid):
-        for col_idx, char in enumerate(row):
-            if char == 'S':
-                return (row_idx, col_idx)
+        col_idx = row.find('S')
+        if col_idx != -1:
+            return (row_idx, col_idx)
     return None
 
 
-def count_timelines(grid, start_row, start_col):
+# _count gives up (returns OVERFLOW) once the path total reaches this bound
+INT64_SAFE = 1 << 62
+OVERFLOW = -1
+
+
+@njit('int64(int8[:, ::1], int64[::1], int64, int64)', boundscheck=False, cache=True)
+def _count(splitters, split_rows, start_row, start_col):
+    """Row-by-row DP over a C-contiguous int8 splitter mask (1 where '^').
+    A row without splitter maps every path straight down (identity step),
+    so only the rows listed in split_rows (ascending) are processed; entries
+    <= start_row are skipped.
+    Each split adds its count to the path total, which at most doubles per
+    row: while the total stays below INT64_SAFE before a row, nothing in that
+    row can pass 2**63. Past it, OVERFLOW is returned instead of a wrapped
+    count.
+    Compiled eagerly for this single signature, with bounds checking off.
+    cache=True stores the machine code in __pycache__, so only the first run
+    on a machine pays the compile; later runs just load it."""
+    cols = splitters.shape[1]
+    cur = np.zeros(cols, dtype=np.int64)
+    nxt = np.zeros(cols, dtype=np.int64)
+    cur[start_col] = 1
+    exits = 0
+    total = 1
+    for row in split_rows:
+        if row <= start_row:
+            continue
+        nxt[:] = 0
+        for col in range(cols):
+            count = cur[col]
+            if count == 0:
+                continue
+            if splitters[row, col]:
+                total += count
+                # Paths split off the left/right edge leave the grid: they are exits
+                if col > 0:
+                    nxt[col - 1] += count
+                else:
+                    exits += count
+                if col + 1 < cols:
+                    nxt[col + 1] += count
+                else:
+                    exits += count
+            else:
+                nxt[col] += count
+        cur, nxt = nxt, cur
+        if total >= INT64_SAFE:
+            return OVERFLOW
+    # Paths still in the grid after the last row exit through the bottom
+    return cur.sum() + exits
+
+
+def _count_exact(splitters, split_rows, start_row, start_col, modulus=None):
+    """Same DP as _count in plain Python ints, for counts that may not fit
+    in int64. With modulus, every row is reduced modulo modulus."""
+    cols = splitters.shape[1]
+    cur = [0] * cols
+    cur[start_col] = 1
+    exits = 0
+    for row in split_rows.tolist():
+        if row <= start_row:
+            continue
+        nxt = [0] * cols
+        for col in np.flatnonzero(splitters[row]).tolist():
+            count = cur[col]
+            if count == 0:
+                continue
+            cur[col] = 0
+            if col > 0:
+                nxt[col - 1] += count
+            else:
+                exits += count
+            if col + 1 < cols:
+                nxt[col + 1] += count
+            else:
+                exits += count
+        cur = [a + b for a, b in zip(cur, nxt)]
+        if modulus is not None:
+            cur = [count % modulus for count in cur]
+            exits %= modulus
+    total = exits + sum(cur)
+    return total if modulus is None else total % modulus
+
+
+@njit('uint64(int8[:, ::1], int64[::1], int64, int64, uint64, int64)', boundscheck=False, cache=True)
+def _count_mod(splitters, split_rows, start_row, start_col, modulus, period):
+    """Same DP as _count, modulo modulus, on uint64 buffers.
+    A cell at most triples per row (itself plus both neighbours splitting
+    into it), so the buffers are only reduced every period rows, period being
+    chosen by the caller so that 3**period * modulus fits in 64 bits."""
+    cols = splitters.shape[1]
+    cur = np.zeros(cols, dtype=np.uint64)
+    nxt = np.zeros(cols, dtype=np.uint64)
+    cur[start_col] = 1
+    exits = np.uint64(0)
+    since_reduce = 0
+    for row in split_rows:
+        if row <= start_row:
+            continue
+        if since_reduce == period:
+            for col in range(cols):
+                cur[col] %= modulus
+            since_reduce = 0
+        nxt[:] = 0
+        for col in range(cols):
+            count = cur[col]
+            if count == 0:
+                continue
+            if splitters[row, col]:
+                if col > 0:
+                    nxt[col - 1] += count
+                else:
+                    exits = (exits + count % modulus) % modulus
+                if col + 1 < cols:
+                    nxt[col + 1] += count
+                else:
+                    exits = (exits + count % modulus) % modulus
+            else:
+                nxt[col] += count
+        cur, nxt = nxt, cur
+        since_reduce += 1
+    for col in range(cols):
+        exits = (exits + cur[col] % modulus) % modulus
+    return exits
+
+
+def count_timelines(grid, start_row, start_col, modulus=None):
     """
     Count unique timelines in quantum tachyon splitting.
     Track the number of different ways to reach each final exit point.
+    With modulus (a positive int), the count is returned modulo modulus;
+    below 2**64 // 3 the DP then runs on wrapping-free uint64 buffers reduced
+    every few rows.
+    Results are cached by grid content, so repeated calls on the same grid
+    are a single lookup.
     """
+    if modulus is not None and modulus <= 0:
+        raise ValueError(f"modulus must be positive, got {modulus}")
+    return _count_cached(tuple(grid), start_row, start_col, modulus)
+
+
+def splitter_mask(grid):
+    """C-contiguous int8 mask of the grid, 1 where '^'."""
     rows = len(grid)
     cols = len(grid[0]) if rows > 0 else 0
-    
-    # Use dynamic programming: count paths to each position
-    # paths[(row, col)] = number of distinct paths to reach this position
-    paths = {}
-    paths[(start_row + 1, start_col)] = 1
-    
-    # Process row by row
-    for current_row in range(start_row + 1, rows + 1):
-        new_paths = {}
-        
-        for (row, col), count in list(paths.items()):
-            if row != current_row:
-                continue
-            
-            # If we're at the exit row, this is a final position
-            if row >= rows:
-                new_paths[(row, col)] = new_paths.get((row, col), 0) + count
-                continue
-            
-            # Check if out of bounds horizontally - these also count as exits
-            if col < 0 or col >= cols:
-                new_paths[(row, col)] = new_paths.get((row, col), 0) + count
-                continue
-            
-            char = grid[row][col]
-            
-            if char == '^':
-                # Split: go left and right
-                new_paths[(row + 1, col - 1)] = new_paths.get((row + 1, col - 1), 0) + count
-                new_paths[(row + 1, col + 1)] = new_paths.get((row + 1, col + 1), 0) + count
-            else:
-                # Continue down
-                new_paths[(row + 1, col)] = new_paths.get((row + 1, col), 0) + count
-        
-        paths = new_paths
-    
-    # Sum all paths that reached the exit (any edge)
-    return sum(count for (row, col), count in paths.items() if row >= rows or col < 0 or col >= cols)
+    splitters = (np.frombuffer(''.join(grid).encode(), dtype=np.uint8) == ord('^')).astype(np.int8)
+    return splitters.reshape(rows, cols)
+
+
+@njit(parallel=True, cache=True)
+def _count_many(grids_packed, split_rows, starts):
+    """_count over a batch of grids, one grid per prange iteration, outside
+    the GIL. split_rows[i] lists the splitter rows of grid i, padded with -1
+    (skipped like any row above the start)."""
+    n = grids_packed.shape[0]
+    counts = np.empty(n, dtype=np.int64)
+    for i in prange(n):
+        counts[i] = _count(grids_packed[i], split_rows[i], starts[i, 0], starts[i, 1])
+    return counts
+
+
+def count_many(grids_packed, starts):
+    """Count timelines for a batch of independent grids of the same shape.
+    grids_packed is an int8[:, :, :] stack of splitter masks (see
+    splitter_mask, np.stack them), starts an int64[:, 2] array of
+    (start_row, start_col). The grids are counted in parallel by
+    _count_many; the few that overflow int64 are redone with _count_exact.
+    Returns a list of counts."""
+    grids_packed = np.ascontiguousarray(grids_packed, dtype=np.int8)
+    starts = np.ascontiguousarray(starts, dtype=np.int64)
+    rows = grids_packed.shape[1]
+    # per grid, each row index if it holds a splitter, -1 otherwise
+    split_rows = np.where(grids_packed.any(axis=2), np.arange(rows), -1).astype(np.int64)
+    counts = _count_many(grids_packed, split_rows, starts).tolist()
+    for i, count in enumerate(counts):
+        if count == OVERFLOW:
+            counts[i] = _count_exact(grids_packed[i], split_rows[i], starts[i, 0], starts[i, 1])
+    return counts
+
+
+@lru_cache(maxsize=32)
+def _count_cached(grid, start_row, start_col, modulus=None):
+    """count_timelines on a hashable (tuple) grid."""
+    splitters = splitter_mask(grid)
+    split_rows = np.flatnonzero(splitters.any(axis=1)).astype(np.int64)
+    if modulus is not None and modulus < 2**64 // 3:
+        # Largest period such that 3**period * modulus < 2**64
+        period = 0
+        bound = modulus
+        while bound * 3 < 2**64:
+            bound *= 3
+            period += 1
+        return int(_count_mod(splitters, split_rows, start_row, start_col, modulus, period))
+    count = int(_count(splitters, split_rows, start_row, start_col))
+    if count == OVERFLOW:
+        # Too many paths for int64: redo the DP in Python ints
+        return _count_exact(splitters, split_rows, start_row, start_col, modulus)
+    return count if modulus is None else count % modulus
 
 
 # Test with the example
@@ -77,8 +247,9 @@ example = """.......S.......
 .^.^.^.^.^...^.
 ..............."""
 
-grid = parse_manifold(example)
-start = find_start(grid)
-if start:
-    result = count_timelines(grid, start[0], start[1])
-    print(f"Example result: {result} (expected 40)")
+
+if __name__ == '__main__':
+    grid, start = parse_manifold(example)
+    if start:
+        result = count_timelines(grid, start[0], start[1])
+        print(f"Example result: {result} (expected 40)")
@@ -1,9 +1,10 @@
-from typing import List, DefaultDict, Optional
+from typing import List, DefaultDict, Optional, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
-import heapq
 import sys
 
+import numpy as np
+
 @dataclass(frozen=True, order=True)
 class JunctionBox:
     """Représente une boîte de jonction avec des coordonnées 3D."""
@@ -27,9 +28,13 @@ class UnionFind:
         self.parent: List[int] = list(range(size))
         self.rank: List[int] = [0] * size
         self.size: List[int] = [1] * size
+        self.components: int = size  # Nombre de circuits distincts
     
     def find(self, x: int) -> int:
-        """Trouve le représentant de l'ensemble contenant x avec compression de chemin.
+        """Trouve le représentant de l'ensemble contenant x avec division de chemin.
+        
+        Version itérative : chaque nœud parcouru est rattaché à son grand-parent,
+        sans récursion (pas de limite de pile ni d'appels imbriqués).
         
         Args:
             x: L'élément dont on cherche le représentant
@@ -37,9 +42,11 @@ class UnionFind:
         Returns:
             Le représentant de l'ensemble contenant x
         """
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])  # Compression de chemin
-        return self.parent[x]
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Division de chemin
+            x = parent[x]
+        return x
     
     def union(self, x: int, y: int) -> bool:
         """Fusionne les ensembles contenant x et y.
@@ -69,6 +76,7 @@ class UnionFind:
             self.size[root_x] += self.size[root_y]
             self.rank[root_x] += 1
         
+        self.components -= 1
         return True
     
     def get_circuit_sizes(self) -> List[int]:
@@ -110,6 +118,24 @@ def parse_input(filename: str) -> List[JunctionBox]:
     
     return boxes
 
+def sorted_pairs(boxes: List[JunctionBox]) -> Tuple[List[int], List[int]]:
+    """Calcule toutes les paires (i, j), i < j, triées par distance croissante.
+    
+    Les distances au carré sont calculées d'un bloc avec numpy ; le tri stable
+    conserve l'ordre (i, j) en cas d'égalité, comme le faisait le tas.
+    
+    Args:
+        boxes: Liste des boîtes de jonction
+        
+    Returns:
+        Les indices i et j des paires, dans l'ordre des distances croissantes
+    """
+    coords = np.array([(box.x, box.y, box.z) for box in boxes], dtype=np.int64)
+    first, second = np.triu_indices(len(boxes), k=1)
+    diff = coords[first] - coords[second]
+    order = np.argsort((diff * diff).sum(axis=1), kind='stable')
+    return first[order].tolist(), second[order].tolist()
+
 def solve_part1(filename: str, num_connections: int) -> int:
     """Résout la première partie du problème des boîtes de jonction.
     
@@ -130,24 +156,21 @@ def solve_part1(filename: str, num_connections: int) -> int:
         print("Erreur: Au moins 3 boîtes sont nécessaires.", file=sys.stderr)
         sys.exit(1)
     
-    # Création d'un tas des distances entre toutes les paires
-    distances = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist = ((boxes[j].x - boxes[i].x)**2 + 
-                   (boxes[j].y - boxes[i].y)**2 + 
-                   (boxes[j].z - boxes[i].z)**2)
-            heapq.heappush(distances, (dist, i, j))
+    # Toutes les paires, de la plus proche à la plus éloignée
+    pairs = zip(*sorted_pairs(boxes))
     
     # Initialisation de la structure Union-Find
     uf = UnionFind(n)
     
     # Établissement des connexions
+    # Parcours de Kruskal : une fois un seul circuit formé, plus aucune
+    # union ne peut réussir, inutile de lire les paires restantes
     connections_made = 0
-    while connections_made < num_connections and distances:
-        _, i, j = heapq.heappop(distances)
+    for i, j in pairs:
         if uf.union(i, j):
             connections_made += 1
+            if connections_made >= num_connections or uf.components == 1:
+                break
     
     # Calcul du résultat
     circuit_sizes = uf.get_circuit_sizes()
@@ -176,24 +199,19 @@ def solve_part2(filename: str) -> Optional[int]:
         print("Erreur: Au moins 2 boîtes sont nécessaires.", file=sys.stderr)
         return None
     
-    # Création d'un tas des distances entre toutes les paires
-    distances = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist = ((boxes[j].x - boxes[i].x)**2 + 
-                   (boxes[j].y - boxes[i].y)**2 + 
-                   (boxes[j].z - boxes[i].z)**2)
-            heapq.heappush(distances, (dist, i, j))
+    # Toutes les paires, de la plus proche à la plus éloignée
+    pairs = zip(*sorted_pairs(boxes))
     
     # Initialisation de la structure Union-Find
     uf = UnionFind(n)
     last_connection: Optional[Tuple[int, int]] = None
     
     # Connexion jusqu'à ce qu'il n'y ait plus qu'un seul circuit
-    while len(uf.get_circuit_sizes()) > 1 and distances:
-        _, i, j = heapq.heappop(distances)
+    for i, j in pairs:
         if uf.union(i, j):
             last_connection = (i, j)
+            if uf.components == 1:
+                break
     
     if not last_connection:
         print("Aucune connexion n'a pu être établie.", file=sys.stderr)
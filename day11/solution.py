@@ -6,7 +6,7 @@ Solution optimisée avec typage statique et documentation complète
 from functools import lru_cache
 from typing import Dict, List, Set, Tuple
 import sys
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # Type pour le graphe de connexions
 Graph = Dict[str, List[str]]
@@ -24,40 +24,40 @@ def parse_input(filename: str) -> Graph:
         FileNotFoundError: Si le fichier n'existe pas
         ValueError: Si le format du fichier est invalide
     """
-    graph: Graph = defaultdict(list)
+    graph: Graph = {}
     
     try:
         with open(filename, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                try:
-                    node, outs = line.split(':', 1)
-                    node = node.strip()
-                    outputs = [out.strip() for out in outs.split() if out.strip()]
-                    
-                    if not node:
-                        raise ValueError(f"Ligne {line_num}: Nom de nœud vide")
-                        
-                    graph[node].extend(outputs)
-                    
-                    # Vérification des références circulaires
-                    for out in outputs:
-                        if out == node:
-                            print(f"Attention: Référence circulaire détectée pour le nœud {node}", 
-                                  file=sys.stderr)
-                            
-                except ValueError as e:
-                    print(f"Erreur de format à la ligne {line_num}: {e}", file=sys.stderr)
-                    continue
-                    
+            lines = f.read().splitlines()
     except FileNotFoundError:
         print(f"Erreur: Le fichier {filename} est introuvable.", file=sys.stderr)
         raise
     
-    return dict(graph)
+    for line_num, line in enumerate(lines, 1):
+        node, sep, outs = line.partition(':')
+        node = node.strip()
+        if not sep:
+            if node:
+                print(f"Erreur de format à la ligne {line_num}: séparateur ':' manquant",
+                      file=sys.stderr)
+            continue
+        if not node:
+            print(f"Erreur de format à la ligne {line_num}: Nom de nœud vide", file=sys.stderr)
+            continue
+            
+        # str.split() sans argument élimine déjà les blancs et les jetons vides
+        outputs = outs.split()
+        if node in graph:
+            graph[node].extend(outputs)
+        else:
+            graph[node] = outputs
+            
+        # Vérification des références circulaires
+        if node in outputs:
+            print(f"Attention: Référence circulaire détectée pour le nœud {node}", 
+                  file=sys.stderr)
+    
+    return graph
 
 class PathCounter:
     """Classe pour compter les chemins dans le graphe avec différentes contraintes."""
@@ -71,6 +71,12 @@ class PathCounter:
         self.graph = graph
         self._validate_graph()
         
+        # Graphe inversé, utilisé pour calculer l'accessibilité des nœuds requis
+        self.reverse_graph: Graph = defaultdict(list)
+        for node, neighbors in graph.items():
+            for neighbor in neighbors:
+                self.reverse_graph[neighbor].append(node)
+        
     def _validate_graph(self) -> None:
         """Vérifie que le graphe est valide (pas de nœuds non déclarés)."""
         all_nodes = set(self.graph.keys())
@@ -80,6 +86,32 @@ class PathCounter:
                     print(f"Attention: Le nœud {neighbor} est référencé mais non déclaré", 
                           file=sys.stderr)
     
+    @lru_cache(maxsize=None)
+    def _required_reach(self, required_nodes: Tuple[str, ...]) -> Dict[str, int]:
+        """Calcule, pour chaque nœud, les nœuds requis accessibles depuis celui-ci.
+        
+        Un parcours en largeur inversé est lancé depuis chaque nœud requis ;
+        le bit correspondant est ajouté à tous les nœuds qui peuvent l'atteindre.
+        
+        Args:
+            required_nodes: Les nœuds qui doivent être visités
+            
+        Returns:
+            Un dictionnaire nœud -> masque de bits des nœuds requis accessibles
+        """
+        reach: Dict[str, int] = defaultdict(int)
+        for bit, required in enumerate(required_nodes):
+            flag = 1 << bit
+            queue = deque([required])
+            reach[required] |= flag
+            while queue:
+                current = queue.popleft()
+                for predecessor in self.reverse_graph.get(current, ()):
+                    if not reach[predecessor] & flag:
+                        reach[predecessor] |= flag
+                        queue.append(predecessor)
+        return dict(reach)
+    
     @lru_cache(maxsize=None)
     def count_paths_to_out(self, node: str) -> int:
         """Compte le nombre de chemins d'un nœud à 'out'.
@@ -96,48 +128,63 @@ class PathCounter:
             return 0
         return sum(self.count_paths_to_out(neighbor) for neighbor in self.graph[node])
     
+    @lru_cache(maxsize=None)
+    def _required_bits(self, required_nodes: Tuple[str, ...]) -> Dict[str, int]:
+        """Associe chaque nœud requis à son bit dans le masque des nœuds visités.
+        
+        Args:
+            required_nodes: Les nœuds qui doivent être visités
+            
+        Returns:
+            Un dictionnaire nœud requis -> bit correspondant
+        """
+        return {required: 1 << bit for bit, required in enumerate(required_nodes)}
+    
     @lru_cache(maxsize=None)
     def count_paths_through_nodes(
         self, 
         node: str, 
         required_nodes: Tuple[str, ...], 
-        visited_nodes: Tuple[str, ...] = ()
+        visited_mask: int = 0
     ) -> int:
         """Compte les chemins qui passent par tous les nœuds requis.
         
+        Seul l'ensemble des nœuds requis déjà visités influence le résultat :
+        il est représenté par un masque de bits, ce qui évite toute allocation
+        dans la récursion. Le graphe est supposé acyclique.
+        
         Args:
             node: Le nœud actuel
             required_nodes: Les nœuds qui doivent être visités
-            visited_nodes: Les nœuds déjà visités dans le chemin actuel
+            visited_mask: Masque des nœuds requis déjà visités avant ce nœud
             
         Returns:
             Le nombre de chemins valides
         """
-        # Mise à jour des nœuds visités
-        current_visited = (*visited_nodes, node)
+        full_mask = (1 << len(required_nodes)) - 1
         
-        # Vérification si tous les nœuds requis ont été visités
-        remaining_required = set(required_nodes) - set(current_visited)
+        # Élagage : un nœud requis non visité est inaccessible depuis ce nœud
+        if full_mask & ~visited_mask & ~self._required_reach(required_nodes).get(node, 0):
+            return 0
+        
+        # Mise à jour des nœuds visités
+        visited_mask |= self._required_bits(required_nodes).get(node, 0)
         
         # Si on est à la sortie, on vérifie si on a visité tous les nœuds requis
         if node == "out":
-            return 1 if not remaining_required else 0
+            return 1 if visited_mask == full_mask else 0
             
         # Si le nœud n'existe pas, c'est une impasse
         if node not in self.graph:
             return 0
             
-        # Si on a déjà visité ce nœud, on évite les cycles
-        if node in visited_nodes:
-            return 0
-            
         # Exploration récursive des voisins
         total = 0
         for neighbor in self.graph[node]:
             total += self.count_paths_through_nodes(
                 neighbor, 
                 required_nodes, 
-                current_visited
+                visited_mask
             )
             
         return total
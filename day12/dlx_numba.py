@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+dlx_numba.py - Numba-compiled Dancing Links search for Day 12.
+
+The matrix is built in Python (see DLX in solution_fixed.py) and handed over
+as plain int32 arrays:
+    L, R, U, D : circular links (row ring / column ring)
+    C          : column header of each node
+    S          : live row count of each column header
+    NI         : instance id of each node (-1 if none)
+    SP         : per instance, 1 if the previous instance has the same shape
+    n_cells    : only headers 1..n_cells are branched on
+    root       : index of the root header
+    sol_buf    : int32 buffer receiving the chosen row nodes
+    deadline   : time.time() after which the search gives up (np.inf: never)
+
+solve() runs Algorithm X iteratively (explicit stack instead of recursion)
+and stops at the first exact cover found. Signals are not handled while
+compiled code runs, so the deadline is checked by the search itself, once
+every CHECK_EVERY row selections. A row of a same-shape instance is
+only accepted once the previous instance is placed (symmetry breaking, see
+DLX in solution_fixed.py).
+"""
+
+import time
+
+import numpy as np
+from numba import njit, objmode
+
+CHECK_EVERY = 1 << 14  # row selections between two deadline checks (power of 2)
+
+
+@njit(boundscheck=False, cache=True, inline='always')
+def _cover(L, R, U, D, C, S, c):
+    R[L[c]] = R[c]; L[R[c]] = L[c]
+    i = D[c]
+    while i != c:
+        j = R[i]
+        while j != i:
+            U[D[j]] = U[j]; D[U[j]] = D[j]
+            S[C[j]] -= 1
+            j = R[j]
+        i = D[i]
+
+
+@njit(boundscheck=False, cache=True, inline='always')
+def _uncover(L, R, U, D, C, S, c):
+    i = U[c]
+    while i != c:
+        j = L[i]
+        while j != i:
+            S[C[j]] += 1
+            U[D[j]] = j; D[U[j]] = j
+            j = L[j]
+        i = U[i]
+    R[L[c]] = c; L[R[c]] = c
+
+
+@njit(boundscheck=False, cache=True)
+def solve(L, R, U, D, C, S, NI, SP, n_cells, root, sol_buf, deadline):
+    """
+    Search for an exact cover, mutating the link arrays in place.
+    Returns the number of rows in the solution (stored as node indices in
+    sol_buf[:depth]), -1 if there is none or -2 once deadline has passed.
+    """
+    cols = np.empty(sol_buf.shape[0] + 1, dtype=np.int32)  # column chosen per depth
+    placed = np.zeros(SP.shape[0], dtype=np.int32)         # 1 once an instance is used
+    depth = 0
+    steps = 0
+    entering = True
+    while True:
+        if entering:
+            if R[root] == root:
+                return depth
+            # choose column with minimal size (MRV) among the cell columns
+            c = R[root]
+            best = c
+            while c != root and c <= n_cells:
+                if S[c] < S[best]:
+                    best = c
+                    if S[c] <= 1:
+                        break
+                c = R[c]
+            c = best
+            if S[c] == 0:
+                entering = False
+                continue
+            _cover(L, R, U, D, C, S, c)
+            cols[depth] = c
+            r = D[c]
+        else:
+            # backtrack: undo the row tried at the previous depth, move to next row
+            depth -= 1
+            if depth < 0:
+                return -1
+            c = cols[depth]
+            r = sol_buf[depth]
+            if NI[r] >= 0:
+                placed[NI[r]] = 0
+            j = L[r]
+            while j != r:
+                _uncover(L, R, U, D, C, S, C[j])
+                j = L[j]
+            r = D[r]
+
+        # skip instances whose same-shape predecessor is still unused
+        while r != c and NI[r] > 0 and SP[NI[r]] and not placed[NI[r] - 1]:
+            r = D[r]
+        if r == c:
+            # no row left for this column
+            _uncover(L, R, U, D, C, S, c)
+            entering = False
+            continue
+        steps += 1
+        if (steps & (CHECK_EVERY - 1)) == 0:
+            with objmode(now='float64'):
+                now = time.time()
+            if now > deadline:
+                return -2
+        # select row r and go one level deeper
+        sol_buf[depth] = r
+        if NI[r] >= 0:
+            placed[NI[r]] = 1
+        j = R[r]
+        while j != r:
+            _cover(L, R, U, D, C, S, C[j])
+            j = R[j]
+        depth += 1
+        entering = True
+
+
+def solve_lists(L, R, U, D, C, S, NI=None, SP=(), n_cells=None, root=0, deadline=np.inf):
+    """Convenience wrapper: copy Python link lists to int32 arrays and solve.
+    Without NI every column is branched on and no instance order is enforced.
+    Returns (ok, chosen_nodes); ok is None if deadline was reached first."""
+    n_cols = len(S) - 1
+    if NI is None:
+        NI = [-1] * len(C)
+    if n_cells is None:
+        n_cells = n_cols
+    arrs = [np.asarray(a, dtype=np.int32) for a in (L, R, U, D, C, S, NI)]
+    # at least one entry so the array keeps its int32 dtype
+    sp = np.asarray(list(SP) or [0], dtype=np.int32)
+    sol_buf = np.empty(max(n_cols, 1), dtype=np.int32)
+    depth = solve(*arrs, sp, np.int32(n_cells), np.int32(root), sol_buf, float(deadline))
+    if depth == -2:
+        return None, []
+    if depth < 0:
+        return False, []
+    return True, sol_buf[:depth].tolist()
+
+
+# warm up once at import so workers don't pay the JIT compile
+# (one column, one row covering it)
+solve_lists([1, 0, 2], [1, 0, 2], [0, 2, 1], [0, 2, 1], [0, 1, 1], [0, 1])
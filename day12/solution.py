@@ -11,8 +11,9 @@ import sys
 # Types personnalisés
 Cell = Tuple[int, int]  # (ligne, colonne)
 Orientation = Tuple[Cell, ...]
-ShapeOrientations = Dict[int, List[Orientation]]
-Placements = Dict[int, List[int]]  # Dictionnaire d'index de forme vers listes de masques de bits
+ShapeOrientations = Dict[int, Tuple[Orientation, ...]]
+Placement = Tuple[int, Tuple[int, ...]]  # (ligne du haut, masques de bits de chaque ligne)
+Placements = Dict[int, List[Placement]]  # Dictionnaire d'index de forme vers listes de placements
 
 def lire_entree(chemin_fichier: str = 'input.txt') -> Tuple[Dict[int, List[str]], List[Tuple[int, int, List[int]]]]:
     """Lit le fichier d'entrée et retourne les formes et régions.
@@ -115,14 +116,21 @@ def retourner(cellules: Orientation) -> Orientation:
     """
     return normaliser_cellules([(r, -c) for r, c in cellules])
 
-def generer_orientations(cellules: List[Cell]) -> Set[Orientation]:
+@lru_cache(maxsize=None)
+def generer_orientations(cellules: Orientation) -> Tuple[Orientation, ...]:
     """Génère toutes les orientations uniques d'une forme.
     
+    Les orientations équivalentes par symétrie sont fusionnées dès ici : une
+    pièce symétrique (carré, barre...) en a moins de 8. Comme deux orientations
+    distinctes ne produisent jamais le même placement, les placements n'ont
+    plus besoin d'être dédoublonnés ensuite.
+    
     Args:
         cellules: Cellules de la forme d'origine
         
     Returns:
-        Ensemble des orientations uniques (rotations et symétries)
+        Tuple trié des orientations uniques (rotations et symétries),
+        partagé par le cache : il ne doit pas être modifié
     """
     orientations = set()
     courante = normaliser_cellules(cellules)
@@ -132,46 +140,51 @@ def generer_orientations(cellules: List[Cell]) -> Set[Orientation]:
         orientations.add(courante)
         orientations.add(retourner(courante))
         
-    return orientations
+    return tuple(sorted(orientations))
 
+@lru_cache(maxsize=None)
 def calculer_placements(
     forme: Orientation, 
     largeur: int, 
     hauteur: int
-) -> List[int]:
+) -> Tuple[Placement, ...]:
     """Calcule tous les placements possibles d'une forme dans une région.
     
+    Le résultat est mis en cache : les régions de mêmes dimensions partagent
+    leurs placements.
+    
     Args:
         forme: Orientation de la forme
         largeur: Largeur de la région
         hauteur: Hauteur de la région
         
     Returns:
-        Liste des masques de bits représentant les placements valides
+        Tuple des placements valides, chacun sous la forme (ligne du haut,
+        masques de bits des lignes couvertes, déjà décalés en colonne)
     """
     if not forme:
-        return []
+        return ()
         
     max_r = max(r for r, _ in forme)
     max_c = max(c for _, c in forme)
-    placements = []
     
-    for r in range(hauteur - max_r):
-        for c in range(largeur - max_c):
-            masque = 0
-            valide = True
-            
-            for dr, dc in forme:
-                nr, nc = r + dr, c + dc
-                if nr < 0 or nr >= hauteur or nc < 0 or nc >= largeur:
-                    valide = False
-                    break
-                masque |= 1 << (nr * largeur + nc)
-                
-            if valide:
-                placements.append(masque)
-                
-    return placements
+    # Masque de chaque ligne de la forme, aligné sur la colonne 0
+    masques_lignes = [0] * (max_r + 1)
+    for dr, dc in forme:
+        masques_lignes[dr] |= 1 << dc
+    
+    # Les masques décalés ne dépendent que de la colonne : ils sont calculés une
+    # fois par colonne puis partagés par toutes les lignes du haut possibles
+    masques_par_colonne = [
+        tuple(masque << c for masque in masques_lignes)
+        for c in range(largeur - max_c)
+    ]
+    lignes_haut = range(hauteur - max_r)
+    return tuple(
+        (r, masques_decales)
+        for masques_decales in masques_par_colonne
+        for r in lignes_haut
+    )
 
 def resoudre_region(
     largeur: int,
@@ -182,6 +195,12 @@ def resoudre_region(
 ) -> bool:
     """Détermine si une région peut être remplie avec les formes données.
     
+    Recherche par masques de bits plutôt qu'Algorithme X (liens dansants) :
+    une colonne par exemplaire de pièce fait explorer chaque pavage une fois
+    par permutation des exemplaires identiques, alors qu'un simple compteur
+    par forme l'évite. On garde de l'Algorithme X le choix de la case la plus
+    contrainte. La version DLX reste dans solution_fixed.py.
+    
     Args:
         largeur: Largeur de la région
         hauteur: Hauteur de la région
@@ -199,7 +218,7 @@ def resoudre_region(
         for idx, orientations in formes_orientations.items()
     }
     
-    if sum(cnt * aire_formes[idx] for idx, cnt in enumerate(comptes)) != aire_totale:
+    if sum(cnt * aire_formes.get(idx, 0) for idx, cnt in enumerate(comptes)) != aire_totale:
         return False
         
     # Préparation des placements
@@ -215,46 +234,112 @@ def resoudre_region(
         if not placements:
             return False
             
-        placements_par_forme[idx] = list(set(placements))
+        placements_par_forme[idx] = placements
     
-    # Préparation des instances à placer
-    instances = [
-        idx 
-        for idx, cnt in enumerate(comptes) 
-        for _ in range(cnt)
-    ]
-    
-    if not instances:
+    if not any(comptes):
         return aire_totale == 0
         
-    # Tri des instances par nombre de placements (moins de placements en premier)
-    instances.sort(key=lambda i: len(placements_par_forme.get(i, [])))
+    # Placements couvrant chaque case : choix de la case de branchement et
+    # détection des cases mortes
+    placements_touchant: List[List[Tuple[int, Placement]]] = [
+        [] for _ in range(largeur * hauteur)
+    ]
+    for idx_forme, placements in placements_par_forme.items():
+        for haut, masques in placements:
+            for i, masque in enumerate(masques):
+                while masque:
+                    bit = masque & -masque
+                    case = (haut + i) * largeur + bit.bit_length() - 1
+                    placements_touchant[case].append((idx_forme, (haut, masques)))
+                    masque ^= bit
+    
+    # Occupation du plateau, un masque de bits par ligne
+    ligne_pleine = (1 << largeur) - 1
+    occupation = [0] * hauteur
+    
+    # Nombre de pièces restant à placer pour chaque forme. Les pièces d'une
+    # même forme sont interchangeables : seul leur nombre compte, et comme
+    # chaque nœud branche sur les placements couvrant une même case, chaque
+    # pavage n'est exploré qu'une seule fois (aucune permutation entre copies
+    # identiques)
+    restants = list(comptes)
     
-    # Vérification rapide
-    if any(not placements_par_forme.get(i) for i in instances):
+    def voisinage_mort(haut: int, masques: Tuple[int, ...]) -> bool:
+        """Vérifie si une case libre voisine d'une pièce ne peut plus être couverte."""
+        for r in range(max(haut - 1, 0), min(haut + len(masques) + 1, hauteur)):
+            # Cases libres de la ligne r adjacentes à la pièce
+            voisins = 0
+            for i in (r - haut - 1, r - haut, r - haut + 1):
+                if 0 <= i < len(masques):
+                    voisins |= masques[i]
+            if 0 <= r - haut < len(masques):
+                voisins |= masques[r - haut] << 1 | masques[r - haut] >> 1
+            voisins &= ligne_pleine & ~occupation[r]
+            
+            while voisins:
+                bit = voisins & -voisins
+                voisins ^= bit
+                for idx_forme, (h, ms) in placements_touchant[r * largeur + bit.bit_length() - 1]:
+                    if restants[idx_forme] and not any(
+                        m & occupation[h + i] for i, m in enumerate(ms)
+                    ):
+                        break
+                else:
+                    return True
         return False
     
-    # Backtracking avec mémoïsation
-    memo = set()
+    # États (pièces restantes, lignes non pleines) déjà prouvés insolubles :
+    # l'ordre des pièces posées pour y arriver n'a aucune importance
+    echecs: Set[Tuple[Tuple[int, ...], Tuple[int, ...]]] = set()
     
-    def backtrack(pos: int, occupe: int) -> bool:
-        if pos == len(instances):
+    def backtrack(ligne: int) -> bool:
+        # Les lignes au-dessus de `ligne` sont déjà remplies
+        while ligne < hauteur and occupation[ligne] == ligne_pleine:
+            ligne += 1
+        if ligne == hauteur:
             return True
             
-        cle = (pos, occupe)
-        if cle in memo:
+        cle = (tuple(restants), tuple(occupation[ligne:]))
+        if cle in echecs:
             return False
             
-        idx_forme = instances[pos]
-        for placement in placements_par_forme.get(idx_forme, []):
-            if (placement & occupe) == 0:
-                if backtrack(pos + 1, occupe | placement):
-                    return True
+        # On branche sur la case libre couverte par le moins de placements
+        # encore jouables (heuristique classique de la couverture exacte)
+        candidats = None
+        for r in range(ligne, hauteur):
+            libres = ~occupation[r] & ligne_pleine
+            while libres:
+                bit = libres & -libres
+                libres ^= bit
+                jouables = [
+                    (idx_forme, (h, ms))
+                    for idx_forme, (h, ms) in placements_touchant[r * largeur + bit.bit_length() - 1]
+                    if restants[idx_forme]
+                    and not any(m & occupation[h + i] for i, m in enumerate(ms))
+                ]
+                if candidats is None or len(jouables) < len(candidats):
+                    candidats = jouables
+                    if len(candidats) <= 1:
+                        break
+            if len(candidats) <= 1:
+                break
+        
+        for idx_forme, (haut, masques) in candidats:
+            for i, masque in enumerate(masques):
+                occupation[haut + i] |= masque
+            restants[idx_forme] -= 1
+            # Une case libre qu'aucun placement jouable ne couvre plus est vue
+            # au nœud suivant (aucun candidat) : pas de contrôle global ici
+            if not voisinage_mort(haut, masques) and backtrack(ligne):
+                return True
+            restants[idx_forme] += 1
+            for i, masque in enumerate(masques):
+                occupation[haut + i] ^= masque
                     
-        memo.add(cle)
+        echecs.add(cle)
         return False
     
-    return backtrack(0, 0)
+    return backtrack(0)
 
 def resoudre_tout(
     formes_brutes: Dict[int, List[str]],
@@ -272,9 +357,8 @@ def resoudre_tout(
     # Précalcul des orientations pour chaque forme
     formes_orientations: ShapeOrientations = {}
     for idx, lignes in formes_brutes.items():
-        cellules = convertir_en_cellules(lignes)
-        orientations = generer_orientations(cellules)
-        formes_orientations[idx] = list(orientations)
+        cellules = tuple(convertir_en_cellules(lignes))
+        formes_orientations[idx] = generer_orientations(cellules)
     
     # Résolution de chaque région
     resultats = []
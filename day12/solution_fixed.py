@@ -10,58 +10,61 @@ Input: input.txt in the same folder (format described by the puzzle).
 Output: prints the number of regions that can fit all presents and per-region result.
 
 Notes:
-- TIMEOUT_PER_REGION controls how many seconds we allow DLX to try per region.
+- TIMEOUT_PER_REGION controls how many seconds a worker may spend on one region.
+- Regions are solved in parallel, one worker process per CPU core.
 - This script finds existence only (stops when first solution is found).
 """
 
+import os
 import re
+import signal
 import time
 import sys
 from collections import defaultdict
-from multiprocessing import Process, Queue
+from functools import lru_cache
+from multiprocessing import Pool, TimeoutError, get_start_method
+
+import numpy as np
+
+from dlx_numba import solve_lists as dlx_solve
 
 # --------- Configuration ----------
 TIMEOUT_PER_REGION = 8.0  # seconds per region (adjust if you want longer)
+BITMASK_MAX_CELLS = 192   # regions up to this many cells use solve_bitmask, larger ones DLX
+UNROLL_MAX_PIECES = 6     # solve_bitmask runs a generated loop nest up to this many pieces
 # ---------------------------------
 
 # --------------------------
 # Parsing functions
 # --------------------------
+_SHAPE_RE = re.compile(r'^(\d+):\s*$')
+_REGION_RE = re.compile(r'^(\d+)x(\d+):\s*(.*)$')
+
 def parse_input(path='input.txt'):
-    lines = open(path, 'r', encoding='utf-8').read().splitlines()
+    # single pass: shape headers open a block of rows (closed by a blank line),
+    # region lines are collected as they come
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
     shapes = {}
-    i = 0
-    n = len(lines)
-
-    # parse shapes
-    while i < n:
-        line = lines[i].strip()
-        if line == '':
-            i += 1
-            continue
-        m = re.match(r'^(\d+):\s*$', line)
-        if not m:
-            break
-        idx = int(m.group(1))
-        i += 1
-        rows = []
-        while i < n and lines[i].strip() != '':
-            rows.append(lines[i].rstrip('\n'))
-            i += 1
-        shapes[idx] = [r.rstrip() for r in rows if r.strip() != '']
-    # parse regions
     regions = []
-    while i < n:
-        line = lines[i].strip()
-        i += 1
+    rows = None  # rows of the shape being read
+    for raw in lines:
+        line = raw.strip()
         if not line:
+            rows = None
             continue
-        m = re.match(r'^(\d+)x(\d+):\s*(.*)$', line)
-        if not m:
+        m = _REGION_RE.match(line)
+        if m:
+            rows = None
+            w = int(m.group(1)); h = int(m.group(2))
+            counts = [int(x) for x in m.group(3).split()]
+            regions.append((w, h, counts))
             continue
-        w = int(m.group(1)); h = int(m.group(2))
-        counts = [int(x) for x in m.group(3).split() if x != '']
-        regions.append((w, h, counts))
+        m = _SHAPE_RE.match(line)
+        if m and not regions:
+            rows = shapes[int(m.group(1))] = []
+        elif rows is not None:
+            rows.append(raw.rstrip())
     return shapes, regions
 
 # --------------------------
@@ -114,117 +117,91 @@ def placement_mask(cells, w, h, top, left):
 def all_placements_for_orientation(ori, w, h):
     maxr = max(r for r,c in ori)
     maxc = max(c for r,c in ori)
-    placements = []
-    for top in range(0, h - maxr):
-        for left in range(0, w - maxc):
-            pm = placement_mask(ori, w, h, top, left)
-            if pm is not None:
-                placements.append(pm)
-    return placements
+    if maxr >= h or maxc >= w:
+        return []
+    # every placement is the (top=0, left=0) mask shifted by top*w + left
+    ref = placement_mask(ori, w, h, 0, 0)
+    tops = np.arange(h - maxr)[:, None]
+    lefts = np.arange(w - maxc)[None, :]
+    shifts = (tops * w + lefts).ravel()
+    if w * h <= 64:
+        return (np.uint64(ref) << shifts.astype(np.uint64)).tolist()
+    # wider boards do not fit in uint64: shift Python ints instead
+    return [ref << s for s in shifts.tolist()]
+
+@lru_cache(maxsize=None)
+def placements_for_shape(oris, w, h):
+    """All distinct placement masks of a shape (tuple of its orientations) on a
+    w x h board, as a sorted tuple."""
+    placements = set()
+    for ori in oris:
+        placements.update(all_placements_for_orientation(ori, w, h))
+    return tuple(sorted(placements))
 
 # --------------------------
-# Dancing Links (DLX) minimal implementation
-# We use sparse representation: columns are integers 0..m-1
-# Rows are lists of column indices that the row covers.
-# We'll implement a classic DLX with arrays (pointer-like) for speed.
-# We stop at first solution found.
+# Dancing Links (DLX) matrix
+# Knuth's Algorithm X over circular doubly-linked lists stored in parallel
+# int lists: L/R link nodes within a row (and column headers within the
+# header row), U/D link nodes within a column, C maps a node to its column
+# header and S holds the live row count of each column.
+# Node 0 is the root, nodes 1..n_cols are the column headers.
+# DLX only builds these links; the search itself runs in the compiled
+# dlx_numba.solve and stops at the first solution found.
+# Symmetry breaking: instances of the same shape are interchangeable, so a
+# plain search finds every tiling once per permutation of their instance
+# columns. With `instances`, the search only branches on board cells and a
+# piece of a shape always takes the lowest unused instance of that shape,
+# which keeps exactly one of those permutations.
 # --------------------------
 
 class DLX:
-    def __init__(self, n_cols, rows):
+    def __init__(self, n_cols, rows, instances=None):
         """
         n_cols: number of columns
         rows: list of lists (columns covered by each row)
+        instances: optional (n_cells, row_inst, same_prev): the first n_cells
+                   columns are board cells, row_inst is the instance id of
+                   each row and same_prev tells, per instance, whether the
+                   previous instance has the same shape
         """
         self.n_cols = n_cols
         self.rows = rows
-        # Build column -> rows index mapping (for heuristics)
-        self.col_rows = [[] for _ in range(n_cols)]
+        # root + headers, linked circularly through the root
+        self.L = [n_cols] + list(range(n_cols))
+        self.R = list(range(1, n_cols + 1)) + [0]
+        self.U = list(range(n_cols + 1))
+        self.D = list(range(n_cols + 1))
+        self.C = list(range(n_cols + 1))
+        self.S = [0] * (n_cols + 1)
+        self.row_of = [-1] * (n_cols + 1)  # node -> original row id
+        if instances is None:
+            n_cells, row_inst, same_prev = n_cols, [-1] * len(rows), []
+        else:
+            n_cells, row_inst, same_prev = instances
+        self.n_cells = n_cells  # only columns 1..n_cells are branched on
+        self.NI = [-1] * (n_cols + 1)  # node -> instance id (-1: none)
+        self.SP = [int(x) for x in same_prev]
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
         for r_idx, row in enumerate(rows):
+            first = -1
             for c in row:
-                self.col_rows[c].append(r_idx)
-        # active sets
-        self.col_active = [True] * n_cols
-        self.row_active = [True] * len(rows)
-        self.solution = []
-        self.found = False
-
-    def choose_column(self):
-        # heuristic: choose active column with minimal remaining rows (MRV)
-        best = -1
-        best_count = 10**9
-        for c in range(self.n_cols):
-            if not self.col_active[c]:
-                continue
-            # count active rows that cover c
-            cnt = 0
-            for r in self.col_rows[c]:
-                if self.row_active[r]:
-                    # also ensure all columns in that row are active?
-                    cnt += 1
-            if cnt < best_count:
-                best_count = cnt
-                best = c
-                if cnt <= 1:
-                    break
-        return best
-
-    def cover(self, c):
-        # deactivate column c and all rows intersecting it
-        self.col_active[c] = False
-        impacted_rows = []
-        for r in self.col_rows[c]:
-            if not self.row_active[r]:
-                continue
-            # deactivate row r
-            self.row_active[r] = False
-            impacted_rows.append(r)
-        return impacted_rows
-
-    def uncover_rows(self, rows_list):
-        # re-activate given rows
-        for r in rows_list:
-            self.row_active[r] = True
-
-    def uncover(self, c, rows_list):
-        # reactivate column and rows
-        self.col_active[c] = True
-        self.uncover_rows(rows_list)
-
-    def search(self, depth=0, max_nodes=10_000_000):
-        # If all columns inactive -> solution found
-        if all(not a for a in self.col_active):
-            self.found = True
-            return True
-        c = self.choose_column()
-        if c == -1:
-            # no column available but not all inactive => fail
-            return False
-        # if no rows cover c -> dead end
-        rows_covering = [r for r in self.col_rows[c] if self.row_active[r]]
-        if not rows_covering:
-            return False
-
-        # Try each row that covers c
-        for r in rows_covering:
-            # select row r: deactivate all columns this row covers and rows intersecting them
-            covered_cols = self.rows[r]
-            # Save impacted rows per column
-            impacted_per_col = {}
-            # For each column in the row, cover it
-            for col in covered_cols:
-                impacted = self.cover(col)
-                impacted_per_col[col] = impacted
-            self.solution.append(r)
-            # Recurse
-            if self.search(depth+1):
-                return True
-            # backtrack
-            self.solution.pop()
-            # uncover columns in reverse order
-            for col in reversed(covered_cols):
-                self.uncover(col, impacted_per_col[col])
-        return False
+                col = c + 1
+                node = len(C)
+                C.append(col)
+                self.row_of.append(r_idx)
+                self.NI.append(row_inst[r_idx])
+                # append at the bottom of the column
+                U.append(U[col]); D.append(col)
+                D[U[col]] = node; U[col] = node
+                S[col] += 1
+                # append at the end of the row ring
+                if first < 0:
+                    first = node
+                    L.append(node); R.append(node)
+                else:
+                    last = L[first]
+                    L.append(last); R.append(first)
+                    R[last] = node; L[first] = node
 
 # --------------------------
 # Convert region -> exact cover rows
@@ -238,7 +215,7 @@ def build_exact_cover_for_region(w, h, shape_oris, counts):
     """
     shape_oris: dict idx -> list of orientation tuples (r,c)
     counts: list of counts per shape idx
-    Returns: n_cols, rows_list
+    Returns: n_cols, rows_list, instances (see DLX), or None, None, None if impossible
     """
     max_shape = max(shape_oris.keys())
     # pad counts
@@ -247,20 +224,23 @@ def build_exact_cover_for_region(w, h, shape_oris, counts):
     # compute areas and quick check
     area_per_shape = {idx: len(shape_oris[idx][0]) for idx in shape_oris}
     total_cells_needed = sum(counts[idx] * area_per_shape.get(idx, 0) for idx in range(max_shape+1))
-    if total_cells_needed > w * h:
-        return None, None  # impossible
+    # every cell is a column, so the pieces must cover the board exactly
+    if total_cells_needed != w * h:
+        return None, None, None  # impossible
 
-    # compute placements per shape
+    # compute placements per shape (cached per (shape, w, h))
     placements_per_shape = {}
-    for idx, oris in shape_oris.items():
-        placements = set()
-        for ori in oris:
-            pls = all_placements_for_orientation(ori, w, h)
-            for pm in pls:
-                placements.add(pm)
-        placements_per_shape[idx] = sorted(placements)
-        if counts[idx] > 0 and len(placements_per_shape[idx]) == 0:
-            return None, None  # impossible
+    covered = 0
+    for idx in shape_oris:
+        placements_per_shape[idx] = placements_for_shape(tuple(shape_oris[idx]), w, h)
+        if counts[idx] > 0:
+            if len(placements_per_shape[idx]) == 0:
+                return None, None, None  # impossible
+            for pm in placements_per_shape[idx]:
+                covered |= pm
+    # dead cell: no placement of a required shape can reach it
+    if covered != (1 << (w * h)) - 1:
+        return None, None, None  # impossible
 
     # Build columns: board cells first
     cell_cols = w * h
@@ -275,39 +255,171 @@ def build_exact_cover_for_region(w, h, shape_oris, counts):
     total_cols = cell_cols + len(instance_map)
     # Now build rows
     rows = []
+    row_inst = []
     # For each instance (with id j and shape idx s) add rows for each placement of shape s
     for inst_id, sidx in enumerate(instance_map):
         inst_col = cell_cols + inst_id
         for pm in placements_per_shape[sidx]:
-            # convert pm bitmask into list of cell columns covered
+            # convert pm bitmask into list of cell columns covered,
+            # peeling off the lowest set bit each time
             cells_covered = []
             bitmask = pm
-            idxbit = 0
             while bitmask:
-                if bitmask & 1:
-                    cells_covered.append(idxbit)
-                bitmask >>= 1; idxbit += 1
+                lsb = bitmask & -bitmask
+                cells_covered.append(lsb.bit_length() - 1)
+                bitmask ^= lsb
             row = cells_covered + [inst_col]
             rows.append(row)
+            row_inst.append(inst_id)
     if len(rows) == 0:
-        return None, None
-    return total_cols, rows
+        return None, None, None
+    # instances of one shape are consecutive in instance_map
+    same_prev = [inst > 0 and instance_map[inst - 1] == sidx
+                 for inst, sidx in enumerate(instance_map)]
+    return total_cols, rows, (cell_cols, row_inst, same_prev)
+
+# --------------------------
+# Direct bitmask search for small regions
+# The board is a single Python int (bit = r*w + c). We always fill the lowest
+# empty cell, so only placements whose lowest bit is that cell are tried.
+# Pieces of the same shape are interchangeable: we keep a remaining count per
+# shape instead of one instance id per piece, which avoids trying the k!
+# orderings of identical pieces.
+# --------------------------
+def solve_bitmask(w, h, shape_oris, counts):
+    full = (1 << (w * h)) - 1
+    total = sum(counts[idx] * len(shape_oris[idx][0]) for idx in shape_oris if idx < len(counts))
+    if total != w * h:
+        return False
+
+    # placements_by_cell[k] = list of (mask, shape idx) whose lowest set bit is k
+    placements_by_cell = [[] for _ in range(w * h)]
+    for idx in shape_oris:
+        if idx >= len(counts) or counts[idx] == 0:
+            continue
+        for pm in placements_for_shape(tuple(shape_oris[idx]), w, h):
+            k = (pm & -pm).bit_length() - 1
+            placements_by_cell[k].append((pm, idx))
+
+    remaining = list(counts)
+    n_pieces = sum(remaining)
+    if n_pieces <= UNROLL_MAX_PIECES:
+        return unrolled_search(n_pieces)(placements_by_cell, full, remaining)
+
+    def dfs(board):
+        if board == full:
+            return True
+        free = ~board & full
+        k = (free & -free).bit_length() - 1
+        for pm, idx in placements_by_cell[k]:
+            if remaining[idx] and not (pm & board):
+                remaining[idx] -= 1
+                if dfs(board | pm):
+                    return True
+                remaining[idx] += 1
+        return False
+
+    return dfs(0)
+
+@lru_cache(maxsize=None)
+def unrolled_search(n_pieces):
+    """
+    Generate and compile the search of solve_bitmask unrolled for exactly
+    n_pieces pieces: one nested for-loop per piece, every board level in its
+    own local (b0, b1, ...), no recursive calls.
+    Since the piece areas sum to the board area, the board is full as soon as
+    the last piece is placed.
+    Returned function: search(PBC, FULL, r) with PBC = placements_by_cell and
+    r = remaining count per shape.
+    """
+    lines = ['def search(PBC, FULL, r):', '    b0 = 0']
+    for k in range(1, n_pieces + 1):
+        ind = '    ' * k
+        lines += [
+            f'{ind}f = ~b{k-1} & FULL',
+            f'{ind}for m{k}, s{k} in PBC[(f & -f).bit_length() - 1]:',
+            f'{ind}    if m{k} & b{k-1} or not r[s{k}]:',
+            f'{ind}        continue',
+            f'{ind}    b{k} = b{k-1} | m{k}',
+            f'{ind}    r[s{k}] -= 1',
+        ]
+    lines.append('    ' * (n_pieces + 1) + 'return True')
+    # give the piece back once its loop level is exhausted
+    for k in range(n_pieces - 1, 0, -1):
+        lines.append('    ' * (k + 1) + f'r[s{k}] += 1')
+    lines.append('    return False')
+    namespace = {}
+    exec(compile('\n'.join(lines), f'<unrolled_search {n_pieces}>', 'exec'), namespace)
+    return namespace['search']
 
 # --------------------------
-# Worker wrapper (timeout-friendly)
+# Worker pool (timeout-friendly)
+# shape_oris is kept in the _SHAPE_ORIS module global and tasks only carry
+# the region itself. With the 'fork' start method the workers inherit the
+# parent's global copy-on-write, so nothing is pickled; otherwise it is sent
+# once per worker through the pool initializer.
 # --------------------------
-def region_worker(idx, w, h, counts, shape_oris, q):
-    """Worker invoked in separate process."""
+_SHAPE_ORIS = None  # orientations of every shape, keyed by shape idx
+
+def _init_worker(shape_oris):
+    global _SHAPE_ORIS
+    _SHAPE_ORIS = shape_oris
+
+# SIGALRM only exists on POSIX; elsewhere only the compiled DLX search and
+# the parent-side backstop in main() bound the time spent on a region
+HAS_ALARM = hasattr(signal, 'SIGALRM')
+PARENT_GRACE = 5.0  # extra seconds the parent waits for a worker to report back
+
+class RegionTimeout(Exception):
+    pass
+
+def _on_alarm(signum, frame):
+    raise RegionTimeout()
+
+def _set_alarm(seconds):
+    # seconds == 0 cancels the pending alarm
+    if HAS_ALARM:
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+def _solve_region(w, h, counts, deadline):
+    """True/False for one region, 'timeout' if the DLX search hit deadline."""
+    if w * h <= BITMASK_MAX_CELLS:
+        return solve_bitmask(w, h, _SHAPE_ORIS, counts)
+    ncols, rows, instances = build_exact_cover_for_region(w, h, _SHAPE_ORIS, counts)
+    if ncols is None:
+        return False
+    # build the links in Python, run the search in the compiled kernel;
+    # the alarm is switched off there, the kernel checks the deadline
+    dlx = DLX(ncols, rows, instances)
+    _set_alarm(0)
+    ok, _nodes = dlx_solve(dlx.L, dlx.R, dlx.U, dlx.D, dlx.C, dlx.S,
+                           dlx.NI, dlx.SP, dlx.n_cells, deadline=deadline)
+    return 'timeout' if ok is None else bool(ok)
+
+def region_worker_pure(idx, w, h, counts):
+    """
+    Worker run inside the pool. Returns (idx, ok, seconds); ok is None on
+    error and 'timeout' after TIMEOUT_PER_REGION seconds.
+    The timeout is enforced here rather than by the parent, so a slow region
+    only costs its own worker TIMEOUT_PER_REGION and the pool is never torn
+    down: SIGALRM interrupts the Python work, the compiled DLX search checks
+    the same deadline itself.
+    """
+    start = time.time()
     try:
-        ncols, rows = build_exact_cover_for_region(w, h, shape_oris, counts)
-        if ncols is None:
-            q.put((idx, False))
-            return
-        dlx = DLX(ncols, rows)
-        ok = dlx.search()
-        q.put((idx, bool(ok)))
+        try:
+            if HAS_ALARM:
+                signal.signal(signal.SIGALRM, _on_alarm)
+            _set_alarm(TIMEOUT_PER_REGION)
+            ok = _solve_region(w, h, counts, start + TIMEOUT_PER_REGION)
+        finally:
+            # the alarm can still fire up to here; the outer try catches it
+            _set_alarm(0)
+    except RegionTimeout:
+        ok = 'timeout'
     except Exception as e:
-        q.put((idx, None))
+        ok = None
+    return idx, ok, time.time() - start
 
 # --------------------------
 # Main entrypoint
@@ -321,33 +433,58 @@ def main():
         shape_oris[idx] = all_orientations(cells)
 
     print(f"Shapes loaded: {len(shape_oris)}; Regions to test: {len(regions)}")
-    total_ok = 0
-    results = []
+    max_shape = max(shape_oris.keys())
+    tasks = []
     for rid, (w, h, counts) in enumerate(regions):
         # pad counts to max shape index
-        max_shape = max(shape_oris.keys())
         if len(counts) <= max_shape:
             counts = counts + [0] * (max_shape + 1 - len(counts))
-        q = Queue()
-        p = Process(target=region_worker, args=(rid, w, h, counts, shape_oris, q))
-        start = time.time()
-        p.start()
-        p.join(TIMEOUT_PER_REGION)
-        if p.is_alive():
-            p.terminate()
-            p.join()
-            print(f"Region {rid} ({w}x{h}) -> TIMEOUT after {TIMEOUT_PER_REGION}s")
-            results.append(None)
+        tasks.append((rid, w, h, counts))
+    # same-sized regions back to back, so workers hit their warm placement cache
+    tasks.sort(key=lambda t: (t[1], t[2]))
+
+    results = [None] * len(regions)
+
+    def report(task, ok, elapsed):
+        # printed as soon as the result is in (regions come in (w, h) order)
+        rid, w, h, _counts = task
+        if ok == 'timeout':
+            print(f"Region {rid} ({w}x{h}) -> TIMEOUT after {TIMEOUT_PER_REGION}s", flush=True)
+            ok = None
+        elif ok is None:
+            print(f"Region {rid} ({w}x{h}) -> ERROR (no result)", flush=True)
         else:
-            if not q.empty():
-                _rid, ok = q.get()
-                print(f"Region {rid} ({w}x{h}) -> {ok} (time {time.time()-start:.2f}s)")
-                results.append(ok)
-                if ok:
-                    total_ok += 1
-            else:
-                print(f"Region {rid} ({w}x{h}) -> ERROR (no result)")
-                results.append(None)
+            print(f"Region {rid} ({w}x{h}) -> {ok} (time {elapsed:.2f}s)", flush=True)
+        results[rid] = ok
+
+    _init_worker(shape_oris)
+    if get_start_method() == 'fork':
+        pool_args = {}
+    else:
+        pool_args = {'initializer': _init_worker, 'initargs': (shape_oris,)}
+    # Workers enforce the timeout themselves. Tasks start in submission order,
+    # so each result is due at most TIMEOUT_PER_REGION after the previous one;
+    # if it does not come (no SIGALRM here, or the worker died) the region is
+    # given up and the remaining ones go to a fresh pool.
+    while tasks:
+        with Pool(processes=os.cpu_count(), **pool_args) as pool:
+            # submit every region up front; workers pick them up as cores free
+            pending = [(task, pool.apply_async(region_worker_pure, task)) for task in tasks]
+            tasks = []
+            for i, (task, res) in enumerate(pending):
+                try:
+                    _rid, ok, elapsed = res.get(TIMEOUT_PER_REGION + PARENT_GRACE)
+                except TimeoutError:
+                    report(task, 'timeout', None)
+                    for later, later_res in pending[i + 1:]:
+                        if later_res.ready():
+                            report(later, *later_res.get()[1:])
+                        else:
+                            tasks.append(later)
+                    break
+                report(task, ok, elapsed)
+        # leaving the with block terminates the pool, stuck workers included
+    total_ok = sum(1 for ok in results if ok)
 
     print(f"\nTotal regions that can fit: {total_ok} (timeouts marked as None)")
 
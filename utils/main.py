@@ -1,28 +1,37 @@
-def solve():
-    with open('input.txt', 'r') as f:
-        rotations = [line.strip() for line in f.readlines()]
+import sys
+
+import numpy as np
+
+
+def print_rotations(rotations, positions):
+    """Affiche le détail de chaque rotation (boucle Python, hors du calcul)."""
     position = 50
-    zero_count = 0
     print(f"Position de départ: {position}")
     print("-" * 50)
-    for i, rotation in enumerate(rotations, 1):
-        direction = rotation[0]
-        distance = int(rotation[1:])
-        old_position = position
-        if direction == 'L':
-            position = (position - distance) % 100
-        else:
-            position = (position + distance) % 100
-        print(f"#{i:3d} | {rotation:5s} | {old_position:2d} → {position:2d}", end="")
-        if position == 0:
-            zero_count += 1
+    for i, (rotation, new_position) in enumerate(zip(rotations, positions.tolist()), 1):
+        print(f"#{i:3d} | {rotation:5s} | {position:2d} → {new_position:2d}", end="")
+        if new_position == 0:
             print(" ✓ ZERO!")
         else:
             print()
-    
+        position = new_position
     print("-" * 50)
+
+
+def solve(verbose=False):
+    with open('input.txt', 'r') as f:
+        rotations = f.read().split()
+    # déplacements signés, puis toutes les positions d'un coup par somme cumulée
+    deltas = np.array(
+        [(-1 if rotation[0] == 'L' else 1) * int(rotation[1:]) for rotation in rotations],
+        dtype=np.int64,
+    )
+    positions = (50 + np.cumsum(deltas)) % 100
+    zero_count = int((positions == 0).sum())
+    if verbose:
+        print_rotations(rotations, positions)
     return zero_count
 
 if __name__ == "__main__":
-    password = solve()
+    password = solve(verbose='-v' in sys.argv[1:])
     print(f"The password is: {password}")